@@ -1,15 +1,31 @@
 import asyncio
+import fnmatch
 import json
 import hashlib
+import mmap
 import os
+import re
 import warnings
 import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, NamedTuple, Optional, Any, Set, Tuple
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # Suppress all ResourceWarnings on Windows
 if os.name == 'nt':
     warnings.filterwarnings("ignore", category=ResourceWarning)
@@ -18,15 +34,183 @@ if os.name == 'nt':
 
     logging.getLogger('asyncio').setLevel(logging.ERROR)
 
+# Chunk size used when hashlib.file_digest is unavailable
+HASH_CHUNK_SIZE = 1 << 20
+
+# With mmap_hashing enabled, files larger than this are hashed straight from a memory map
+MMAP_HASH_THRESHOLD = 1 << 20
+
+# Files larger than this are mapped in sequential windows to limit page-cache pressure
+MMAP_WINDOWED_THRESHOLD = 256 << 20
+MMAP_WINDOW_SIZE = 64 << 20
+
+# Buffer size for index and export writes (io.DEFAULT_BUFFER_SIZE is 8 KiB)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Maximum number of queued read_file calls sent to the MCP server together
+READ_BATCH_MAX = 64
+
+# Seconds to wait before writing a modified index back to disk
+INDEX_FLUSH_DELAY = 0.5
+
+# Above this many entries, name searches scan one joined string of all names
+NAME_BLOB_THRESHOLD = 10_000
+
+# Directories never descended into while indexing (dot-directories are skipped as well)
+DEFAULT_EXCLUDE_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'dist', 'build'}
+
+
+def _dump_json(data: Dict[str, Any]) -> bytes:
+    """Serialize data to UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _load_json(raw: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _load_index_file(path: Path) -> Any:
+    """Parse a persisted index, choosing msgpack or JSON by file suffix"""
+    # Single unbuffered slurp of the whole file
+    raw = path.read_bytes()
+    if path.suffix == '.msgpack':
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    return _load_json(raw)
+
+
+class FileEntry(NamedTuple):
+    """Indexed metadata of a single file, keyed by its relative path in file_index"""
+    name: str
+    extension: str
+    size: int
+    mtime_ns: int
+    ctime_ns: int
+    hash: str
+    indexed_at: str
+
+
+def _iso_to_ns(value: Any) -> int:
+    """Convert a legacy ISO timestamp to epoch nanoseconds, or 0 if it is missing or invalid"""
+    try:
+        return round(datetime.fromisoformat(value).timestamp() * 1e6) * 1000
+    except (TypeError, ValueError):
+        return 0
+
+
+def _same_mtime(saved_ns: int, stat_ns: int) -> bool:
+    """Compare a saved mtime with a stat result at the precision the saved value has"""
+    if saved_ns == stat_ns:
+        return True
+    # Values converted from legacy ISO strings only carry microseconds (rounded via float)
+    return saved_ns % 1000 == 0 and abs(saved_ns - stat_ns) <= 1000
+
+
+def _entry_from_dict(metadata: Dict[str, Any]) -> FileEntry:
+    """Build a FileEntry from its saved dict form, tolerating older index layouts"""
+    return FileEntry(
+        name=metadata.get('name', ''),
+        extension=sys.intern(metadata.get('extension', '')),
+        size=metadata.get('size', 0),
+        # Older indexes stored ISO 'modified'/'created' strings instead of nanoseconds
+        mtime_ns=metadata.get('mtime_ns') or _iso_to_ns(metadata.get('modified')),
+        ctime_ns=metadata.get('ctime_ns') or _iso_to_ns(metadata.get('created')),
+        hash=metadata.get('hash', ''),
+        indexed_at=metadata.get('indexed_at', '')
+    )
+
+
+def _pack_index(file_index: Dict[str, FileEntry]) -> Dict[str, Any]:
+    """Encode file_index with each directory path stored once.
+
+    Every entry becomes a row of [dir_id, *FileEntry]; the relative path is
+    rebuilt from dirs[dir_id] and the entry name.
+    """
+    dir_ids: Dict[str, int] = {}
+    entries = []
+    for filepath, entry in file_index.items():
+        directory = filepath.rpartition(os.sep)[0]
+        dir_id = dir_ids.setdefault(directory, len(dir_ids))
+        entries.append([dir_id, *entry])
+    return {'dirs': list(dir_ids), 'fields': list(FileEntry._fields), 'entries': entries}
+
+
+def _unpack_index(packed: Dict[str, Any]) -> Dict[str, FileEntry]:
+    """Decode the output of _pack_index back into a file_index dict"""
+    # Rows are positional: a different FileEntry layout cannot be decoded safely,
+    # so start empty and let the next refresh rehash everything
+    if packed.get('fields') != list(FileEntry._fields):
+        print("Index was saved with a different entry layout, rebuilding it")
+        return {}
+    dirs = packed['dirs']
+    file_index = {}
+    for dir_id, name, extension, *fields in packed['entries']:
+        directory = dirs[dir_id]
+        filepath = directory + os.sep + name if directory else name
+        file_index[filepath] = FileEntry(name, sys.intern(extension), *fields)
+    return file_index
+
+
+def _write_bytes(path, payload: bytes):
+    """Write payload to path through a large write buffer"""
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(payload)
+
 
 class MCPFilesystemManager:
     """MCP Filesystem Manager with indexing and metadata capabilities for offline use"""
 
-    def __init__(self, base_directory: str, index_file: str = ".mcp_index.json"):
+    def __init__(self, base_directory: str, index_file: str = ".mcp_index.json", auto_refresh: bool = True,
+                 exclude_dirs: Optional[Iterable[str]] = None, exclude_patterns: Optional[List[str]] = None,
+                 mmap_hashing: bool = False):
         self.base_directory = Path(base_directory).resolve()
         self.index_file = self.base_directory / index_file
-        self.metadata_cache = {}
-        self.file_index = {}
+        # Binary copy of the index, used instead of index_file when msgpack is installed
+        self.binary_index_file = self.index_file.with_suffix('.msgpack')
+        # Prefix stripped from absolute paths to get index keys
+        base = str(self.base_directory)
+        self._base_str = base if base.endswith(os.sep) else base + os.sep
+        self._base_cmp = os.path.normcase(self._base_str)
+        self.auto_refresh = auto_refresh
+        # Opt-in: a file truncated while mapped raises SIGBUS, which cannot be caught,
+        # so only enable this when indexed files are not rewritten during a refresh
+        self.mmap_hashing = mmap_hashing
+
+        # Scan filters: directory names to prune and .gitignore-style name globs
+        self.exclude_dirs = set(DEFAULT_EXCLUDE_DIRS if exclude_dirs is None else exclude_dirs)
+        self.exclude_glob_patterns = list(exclude_patterns or [])
+        self._exclude_re = (re.compile('|'.join(fnmatch.translate(p) for p in self.exclude_glob_patterns))
+                            if self.exclude_glob_patterns else None)
+        self.metadata_cache: Dict[str, Dict[str, Any]] = {}  # Custom metadata by relative path
+        self.last_accessed: Dict[str, str] = {}
+        self.file_index: Dict[str, FileEntry] = {}
+
+        # Pending index writes are batched and flushed after INDEX_FLUSH_DELAY
+        self._dirty = False
+        self._flush_handle = None
+        self._save_blocked = False
+
+        # Read access times (epoch seconds), folded into last_accessed on save
+        self._atime_buf: Dict[str, float] = {}
+
+        # Concurrent read_file calls are coalesced into batches by a drainer task
+        self._read_queue: Optional[asyncio.Queue] = None
+        self._read_drainer: Optional[asyncio.Task] = None
+        self._read_batches: Set[asyncio.Task] = set()
+
+        # Secondary lookups for search_files, kept in sync with file_index
+        self._by_ext: Dict[str, Dict[str, None]] = {}  # Ordered sets of paths
+        self._name_lc: Dict[str, str] = {}
+        self._by_size: Optional[List[Tuple[int, str]]] = None  # Sorted on demand, None when stale
+        self._ext_counts: Counter = Counter()
+        self._total_size = 0
+
+        # NUL-joined lowercase names with the start offset and path of each, built lazily
+        self._name_blob: Optional[Tuple[str, List[int], List[str]]] = None
 
         # MCP Server parameters - Using mcp-server-filesystem directly
         self.server_params = StdioServerParameters(
@@ -50,7 +234,8 @@ class MCPFilesystemManager:
             print(f"MCP session initialized: {result}")
 
             # Refresh file index on startup
-            await self.refresh_index()
+            if self.auto_refresh:
+                await self.refresh_index()
 
             return self
         except Exception as e:
@@ -60,7 +245,16 @@ class MCPFilesystemManager:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         # Save index before closing
-        self._save_index()
+        self.flush_index()
+
+        # Stop the read batching task and fail reads it will never send
+        if self._read_drainer is not None:
+            self._read_drainer.cancel()
+            self._read_drainer = None
+        for task in list(self._read_batches):
+            task.cancel()
+        self._fail_queued_reads(RuntimeError("MCP session closed"))
+        self._read_queue = None
 
         # Properly close session and stdio client
         try:
@@ -80,90 +274,352 @@ class MCPFilesystemManager:
 
     def _load_index(self):
         """Load file index from disk"""
+        index_path = self._pick_index_file()
         try:
-            if self.index_file.exists():
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.file_index = data.get('file_index', {})
-                    self.metadata_cache = data.get('metadata_cache', {})
+            if index_path is not None:
+                data = _load_index_file(index_path)
+                self.metadata_cache = data.get('metadata_cache', {})
+                self.last_accessed = data.get('last_accessed', {})
+                packed = data.get('file_index', {})
+                if isinstance(packed.get('entries'), list):
+                    self.file_index = _unpack_index(packed)
+                    packed = {}
+                else:
+                    self.file_index = {}
+                for filepath, metadata in packed.items():
+                    self.file_index[filepath] = _entry_from_dict(metadata)
+                    # Older indexes kept these fields inside each entry
+                    if 'custom_metadata' in metadata:
+                        self.metadata_cache.setdefault(filepath, {}).update(metadata['custom_metadata'])
+                    if 'last_accessed' in metadata:
+                        self.last_accessed.setdefault(filepath, metadata['last_accessed'])
                 print(f"Loaded index with {len(self.file_index)} files")
             else:
                 print("No existing index found, will create new one")
         except Exception as e:
             print(f"Error loading index: {e}")
+            # Keep the unreadable file (and its custom metadata) instead of overwriting it on the next save
+            backup = index_path.with_name(index_path.name + '.bak')
+            try:
+                index_path.replace(backup)
+                print(f"Moved unreadable index to {backup}")
+            except OSError:
+                pass
             self.file_index = {}
             self.metadata_cache = {}
+            self.last_accessed = {}
+        self._rebuild_lookups()
+
+    def _pick_index_file(self) -> Optional[Path]:
+        """Return the most recently saved index file this installation can read"""
+        candidates = [p for p in (self.binary_index_file, self.index_file) if p.exists()]
+        candidates.sort(key=lambda p: p.stat().st_mtime_ns, reverse=True)
+        if candidates and candidates[0].suffix == '.msgpack' and msgpack is None:
+            # The latest index (and its custom metadata) is unreadable here; never save over it
+            print(f"{candidates[0].name} needs msgpack, which is not installed; index changes will not be saved")
+            self._save_blocked = True
+            candidates = candidates[1:]
+        return candidates[0] if candidates else None
+
+    def _rebuild_lookups(self):
+        """Rebuild the search lookups and running stats from file_index"""
+        self._by_ext = {}
+        self._name_lc = {}
+        self._by_size = None
+        self._ext_counts = Counter()
+        self._total_size = 0
+        self._name_blob = None
+        for filepath, entry in self.file_index.items():
+            self._total_size += entry.size
+            self._by_ext.setdefault(entry.extension, {})[filepath] = None
+            self._ext_counts[entry.extension] += 1
+            self._name_lc[filepath] = entry.name.lower()
+
+    def _add_to_lookups(self, filepath: str, entry: FileEntry):
+        """Register a single index entry in the search lookups"""
+        self._by_ext.setdefault(entry.extension, {})[filepath] = None
+        self._ext_counts[entry.extension] += 1
+        self._total_size += entry.size
+        self._name_lc[filepath] = entry.name.lower()
+        self._name_blob = None
+        self._by_size = None
+
+    def _sorted_sizes(self) -> List[Tuple[int, str]]:
+        """Return the (size, path) list, rebuilding it once if entries changed since the last size search"""
+        if self._by_size is None:
+            self._by_size = sorted((entry.size, filepath) for filepath, entry in self.file_index.items())
+        return self._by_size
+
+    def _remove_from_lookups(self, filepath: str):
+        """Drop a single index entry from the search lookups"""
+        entry = self.file_index.get(filepath)
+        if entry is None:
+            return
+        self._total_size -= entry.size
+        ext = entry.extension
+        paths = self._by_ext.get(ext)
+        if paths and filepath in paths:
+            del paths[filepath]
+            if not paths:
+                del self._by_ext[ext]
+            self._ext_counts[ext] -= 1
+            if not self._ext_counts[ext]:
+                del self._ext_counts[ext]
+        self._name_lc.pop(filepath, None)
+        self._name_blob = None
+        self._by_size = None
+
+    def _mark_dirty(self):
+        """Flag the index as modified and schedule a debounced save"""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop: saved on flush_index() or __aexit__
+        # Restart the delay on every change so a burst of writes saves once
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(INDEX_FLUSH_DELAY, self._save_index)
+
+    def flush_index(self):
+        """Write pending index changes to disk immediately"""
+        self._save_index()
+
+    def _fold_access_times(self):
+        """Move buffered read times into last_accessed as ISO strings"""
+        if not self._atime_buf:
+            return
+        # last_accessed now holds values that are not on disk yet
+        self._dirty = True
+        for relative_path, accessed in self._atime_buf.items():
+            self.last_accessed[relative_path] = datetime.fromtimestamp(accessed).isoformat()
+        self._atime_buf.clear()
+
+    def _describe(self, filepath: str, entry: FileEntry) -> Dict[str, Any]:
+        """Expand an index entry into the metadata dict shown to callers"""
+        metadata = entry._asdict()
+        metadata['path'] = filepath
+        # 0 means the time is unknown, not 1970-01-01
+        if entry.ctime_ns:
+            metadata['created'] = datetime.fromtimestamp(entry.ctime_ns / 1e9).isoformat()
+        if entry.mtime_ns:
+            metadata['modified'] = datetime.fromtimestamp(entry.mtime_ns / 1e9).isoformat()
+        if filepath in self.last_accessed:
+            metadata['last_accessed'] = self.last_accessed[filepath]
+        if filepath in self.metadata_cache:
+            metadata['custom_metadata'] = self.metadata_cache[filepath]
+        return metadata
 
     def _save_index(self):
-        """Save file index to disk"""
+        """Save file index to disk if it has unsaved changes"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._save_blocked or (not self._dirty and not self._atime_buf):
+            return
+
+        self._fold_access_times()
+
         try:
             index_data = {
-                'file_index': self.file_index,
+                'file_index': _pack_index(self.file_index),
                 'metadata_cache': self.metadata_cache,
+                'last_accessed': self.last_accessed,
                 'last_updated': datetime.now().isoformat()
             }
 
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(index_data, f, indent=2, ensure_ascii=False)
+            if msgpack is not None:
+                _write_bytes(self.binary_index_file, msgpack.packb(index_data, use_bin_type=True))
+            else:
+                _write_bytes(self.index_file, _dump_json(index_data))
+            self._dirty = False
             print(f"Index saved with {len(self.file_index)} files")
         except Exception as e:
             print(f"Error saving index: {e}")
 
-    def _calculate_file_hash(self, filepath: Path) -> str:
+    def _calculate_file_hash(self, filepath) -> str:
         """Calculate SHA256 hash of file content"""
         try:
-            hasher = hashlib.sha256()
-            with open(filepath, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
+            with open(filepath, 'rb', buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                if self.mmap_hashing and size > MMAP_HASH_THRESHOLD:
+                    return self._hash_mapped(f, size)
+
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+
+                # Python < 3.11: reuse one 1 MiB buffer for every chunk
+                hasher = hashlib.sha256()
+                buf = bytearray(HASH_CHUNK_SIZE)
+                view = memoryview(buf)
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    hasher.update(view[:n])
+                return hasher.hexdigest()
         except Exception as e:
             print(f"Error calculating hash for {filepath}: {e}")
             return ""
 
-    def _get_file_metadata(self, filepath: Path) -> Dict[str, Any]:
-        """Extract file metadata"""
+    def _hash_mapped(self, f, size: int) -> str:
+        """SHA256 of an open file via mmap, so the hasher reads the page cache without copies"""
+        hasher = hashlib.sha256()
+        if size <= MMAP_WINDOWED_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self._check_not_truncated(f, len(mm))
+                hasher.update(mm)
+            return hasher.hexdigest()
+
+        advice = getattr(mmap, 'MADV_SEQUENTIAL', None)
+        for offset in range(0, size, MMAP_WINDOW_SIZE):
+            length = min(MMAP_WINDOW_SIZE, size - offset)
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as mm:
+                if advice is not None:
+                    mm.madvise(advice)
+                self._check_not_truncated(f, offset + length)
+                hasher.update(mm)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _check_not_truncated(f, end: int):
+        """Refuse to touch mapped pages past the current end of the file"""
+        if os.fstat(f.fileno()).st_size < end:
+            raise OSError("file was truncated while being hashed")
+
+    def _get_file_metadata(self, filepath: str,
+                           stat: Optional[os.stat_result] = None,
+                           file_hash: Optional[str] = None,
+                           indexed_at: Optional[str] = None) -> Optional[FileEntry]:
+        """Extract file metadata, reusing a cached stat result and hash when given"""
         try:
-            stat = filepath.stat()
-            return {
-                'size': stat.st_size,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'extension': filepath.suffix.lower(),
-                'name': filepath.name,
-                'path': str(filepath.relative_to(self.base_directory)),
-                'hash': self._calculate_file_hash(filepath),
-                'indexed_at': datetime.now().isoformat()
-            }
+            if stat is None:
+                stat = os.stat(filepath)
+            name = os.path.basename(filepath)
+            return FileEntry(
+                name=name,
+                extension=sys.intern(os.path.splitext(name)[1].lower()),
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                ctime_ns=stat.st_ctime_ns,
+                hash=file_hash if file_hash is not None else self._calculate_file_hash(filepath),
+                indexed_at=indexed_at or datetime.now().isoformat()
+            )
         except Exception as e:
             print(f"Error getting metadata for {filepath}: {e}")
-            return {}
+            return None
 
-    async def refresh_index(self):
-        """Refresh the file index by scanning the directory"""
-        print("Refreshing file index...")
-        new_index = {}
+    async def _get_file_metadata_async(self, entry: os.DirEntry, stat: os.stat_result,
+                                       indexed_at: str) -> Optional[FileEntry]:
+        """Extract file metadata, hashing the content in a worker thread"""
+        file_hash = await asyncio.to_thread(self._calculate_file_hash, entry.path)
+        return self._get_file_metadata(entry.path, stat, file_hash, indexed_at)
+
+    def _relative_path(self, absolute_path: str) -> str:
+        """Strip the base directory prefix from an absolute path"""
+        # Collapse './', '..' and, on Windows, forward slashes; compare case-insensitively there
+        path = os.path.normpath(absolute_path)
+        if not os.path.normcase(path).startswith(self._base_cmp):
+            raise ValueError(f"{absolute_path!r} is not in the subpath of {str(self.base_directory)!r}")
+        return path[len(self._base_str):]
+
+    def _iter_files(self, root: str):
+        """Yield a DirEntry for every regular file below root using os.scandir"""
+        exclude_dirs = self.exclude_dirs
+        exclude_match = self._exclude_re.match if self._exclude_re is not None else None
+        pending = deque([root])
+        while pending:
+            directory = pending.popleft()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if exclude_match is not None and exclude_match(name):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            # Prune excluded and hidden directories before descending
+                            if name not in exclude_dirs and not name.startswith('.'):
+                                pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and not name.startswith('.mcp_'):
+                            yield entry
+            except OSError as e:
+                print(f"Error scanning {directory}: {e}")
+
+    async def iter_refresh(self):
+        """Rescan the directory, updating file_index in place.
+
+        Yields an (event, relative_path) tuple for every 'new', 'changed' or
+        'removed' file as soon as it is known.
+        """
+        seen = set()
+        tasks = []
+        prefix_len = len(self._base_str)
+        indexed_at = datetime.now().isoformat()
+        sem = asyncio.Semaphore(min(32, (os.cpu_count() or 1) * 4))
+
+        async def scan_entry(entry, relative_path, stat):
+            async with sem:
+                return relative_path, await self._get_file_metadata_async(entry, stat, indexed_at)
 
         try:
             # Scan all files in directory
-            for filepath in self.base_directory.rglob('*'):
-                if filepath.is_file() and not filepath.name.startswith('.mcp_'):
-                    relative_path = str(filepath.relative_to(self.base_directory))
-
-                    # Get file metadata
-                    metadata = self._get_file_metadata(filepath)
+            for entry in self._iter_files(str(self.base_directory)):
+                relative_path = entry.path[prefix_len:]
+                seen.add(relative_path)
+                stat = entry.stat()
+                old = self.file_index.get(relative_path)
+
+                # Unchanged size and mtime: keep the cached hash without reading the file
+                # (an empty hash means the last read failed, so retry it)
+                if old and old.hash and old.size == stat.st_size and _same_mtime(old.mtime_ns, stat.st_mtime_ns):
+                    continue
+
+                # Hash new or modified files concurrently (DirEntry caches its stat result)
+                tasks.append(asyncio.create_task(scan_entry(entry, relative_path, stat)))
+
+            # Store entries as their hashes complete
+            for task in asyncio.as_completed(tasks):
+                relative_path, entry = await task
+                if entry is None:
+                    seen.discard(relative_path)
+                    continue
+                # Keep the search lookups in step so callers can query between events
+                old = self.file_index.get(relative_path)
+                self._remove_from_lookups(relative_path)
+                self.file_index[relative_path] = entry
+                self._add_to_lookups(relative_path, entry)
+                self._dirty = True
+
+                # Check if file has changed
+                if old is None:
+                    yield 'new', relative_path
+                elif old.hash != entry.hash:
+                    yield 'changed', relative_path
+
+            # Drop files that no longer exist, with their custom metadata and access times
+            for stale in self.file_index.keys() - seen:
+                self._remove_from_lookups(stale)
+                del self.file_index[stale]
+                self.metadata_cache.pop(stale, None)
+                self.last_accessed.pop(stale, None)
+                self._dirty = True
+                yield 'removed', stale
+        finally:
+            # The generator may be closed early; stop hashing files nobody will store
+            for task in tasks:
+                task.cancel()
+            # Schedule a single save for the whole refresh
+            if self._dirty:
+                self._mark_dirty()
 
-                    # Check if file has changed
-                    if relative_path in self.file_index:
-                        old_hash = self.file_index[relative_path].get('hash', '')
-                        if old_hash != metadata.get('hash', ''):
-                            print(f"File changed: {relative_path}")
-                    else:
-                        print(f"New file found: {relative_path}")
-
-                    new_index[relative_path] = metadata
+    async def refresh_index(self):
+        """Refresh the file index by scanning the directory"""
+        print("Refreshing file index...")
+        messages = {'new': "New file found", 'changed': "File changed", 'removed': "File removed"}
 
-            self.file_index = new_index
+        try:
+            async for event, relative_path in self.iter_refresh():
+                print(f"{messages[event]}: {relative_path}")
             print(f"Index refreshed: {len(self.file_index)} files indexed")
 
         except Exception as e:
@@ -178,19 +634,85 @@ class MCPFilesystemManager:
             else:
                 absolute_path = filepath
 
-            result = await self.session.call_tool("read_file", {"path": absolute_path})
+            # Queue the read so concurrent callers share one batch of MCP requests
+            if self._read_drainer is None or self._read_drainer.done():
+                self._fail_queued_reads(RuntimeError("read batching task stopped"))
+                self._read_queue = asyncio.Queue()
+                self._read_drainer = asyncio.create_task(self._drain_reads())
+            future = asyncio.get_running_loop().create_future()
+            self._read_queue.put_nowait((absolute_path, future))
+            result = await future
             content = result.content[0].text if result.content else None
 
             # Update access time in metadata
-            relative_path = str(Path(absolute_path).relative_to(self.base_directory))
+            relative_path = self._relative_path(absolute_path)
             if relative_path in self.file_index:
-                self.file_index[relative_path]['last_accessed'] = datetime.now().isoformat()
+                self._atime_buf[relative_path] = time.time()
 
             return content
         except Exception as e:
             print(f"Error reading file {filepath}: {e}")
             return None
 
+    async def _drain_reads(self):
+        """Send queued read_file calls to the MCP server in batches"""
+        while True:
+            batch = [await self._read_queue.get()]
+            # Adaptive batching: flush a lone request at once, otherwise take what is already waiting
+            while len(batch) < READ_BATCH_MAX and not self._read_queue.empty():
+                batch.append(self._read_queue.get_nowait())
+
+            # Send the batch in its own task so reads queued meanwhile are not held behind it
+            task = asyncio.create_task(self._send_reads(batch))
+            self._read_batches.add(task)
+            task.add_done_callback(self._read_batches.discard)
+            # Fails whatever a cancelled batch left unresolved; a no-op once it has finished
+            task.add_done_callback(
+                lambda _, batch=batch: self._fail_reads(batch, RuntimeError("read batching task stopped")))
+
+    async def _send_reads(self, batch):
+        """Call read_file for one batch and resolve its futures"""
+        try:
+            results = await asyncio.gather(
+                *(self.session.call_tool("read_file", {"path": path}) for path, _ in batch),
+                return_exceptions=True
+            )
+        except Exception as e:
+            # e.g. no session yet: fail this batch but keep serving later reads
+            self._fail_reads(batch, e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _fail_reads(batch, exc: BaseException):
+        """Resolve the futures of queued reads with exc"""
+        for _, future in batch:
+            if not future.done():
+                try:
+                    future.set_exception(exc)
+                except RuntimeError:
+                    pass  # Future belongs to an event loop that is already closed
+
+    def _fail_queued_reads(self, exc: BaseException):
+        """Fail every read still waiting in the queue"""
+        if self._read_queue is None:
+            return
+        pending = []
+        while not self._read_queue.empty():
+            pending.append(self._read_queue.get_nowait())
+        self._fail_reads(pending, exc)
+
+    async def read_files(self, filepaths: List[str]) -> List[Optional[str]]:
+        """Read several files using MCP, pipelining the requests"""
+        return await asyncio.gather(*(self.read_file(filepath) for filepath in filepaths))
+
     async def write_file(self, filepath: str, content: str) -> bool:
         """Write file using MCP and update index"""
         try:
@@ -206,10 +728,15 @@ class MCPFilesystemManager:
             })
 
             # Update index after successful write
-            full_path = Path(absolute_path)
-            if full_path.exists():
-                relative_path = str(full_path.relative_to(self.base_directory))
-                self.file_index[relative_path] = self._get_file_metadata(full_path)
+            if os.path.exists(absolute_path):
+                relative_path = self._relative_path(absolute_path)
+                entry = self._get_file_metadata(absolute_path)
+                if entry is None:
+                    return True
+                self._remove_from_lookups(relative_path)
+                self.file_index[relative_path] = entry
+                self._add_to_lookups(relative_path, entry)
+                self._mark_dirty()
 
             return True
         except Exception as e:
@@ -232,34 +759,56 @@ class MCPFilesystemManager:
             print(f"Error listing directory {path}: {e}")
             return []
 
+    def _search_names(self, query_lower: str) -> List[str]:
+        """Return paths whose lowercase file name contains query_lower"""
+        if len(self._name_lc) <= NAME_BLOB_THRESHOLD:
+            return [p for p, name_lc in self._name_lc.items() if query_lower in name_lc]
+
+        if self._name_blob is None:
+            paths = list(self._name_lc)
+            starts = []
+            offset = 0
+            for name_lc in self._name_lc.values():
+                starts.append(offset)
+                offset += len(name_lc) + 1
+            self._name_blob = ('\0'.join(self._name_lc.values()), starts, paths)
+
+        # File names cannot contain NUL, so a match never spans two names;
+        # after each hit, resume the C-level find at the next name
+        blob, starts, paths = self._name_blob
+        results = []
+        pos = blob.find(query_lower)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            results.append(paths[i])
+            if i + 1 == len(starts):
+                break
+            pos = blob.find(query_lower, starts[i + 1])
+        return results
+
     async def search_files(self, query: str, search_type: str = "name") -> List[Dict[str, Any]]:
         """Search files in the index"""
-        results = []
         query_lower = query.lower()
 
-        for filepath, metadata in self.file_index.items():
-            match = False
-
-            if search_type == "name":
-                match = query_lower in metadata.get('name', '').lower()
-            elif search_type == "extension":
-                match = metadata.get('extension', '').lower() == query_lower
-            elif search_type == "path":
-                match = query_lower in filepath.lower()
-            elif search_type == "size":
-                try:
-                    size_bytes = int(query)
-                    match = metadata.get('size', 0) >= size_bytes
-                except ValueError:
-                    match = False
+        if search_type == "name":
+            paths = self._search_names(query_lower)
+        elif search_type == "extension":
+            paths = list(self._by_ext.get(query_lower, ()))
+        elif search_type == "path":
+            paths = [p for p in self.file_index if query_lower in p.lower()]
+        elif search_type == "size":
+            try:
+                size_bytes = int(query)
+            except ValueError:
+                return []
+            by_size = self._sorted_sizes()
+            start = bisect_left(by_size, (size_bytes,))
+            paths = [p for _, p in by_size[start:]]
+        else:
+            return []
 
-            if match:
-                results.append({
-                    'path': filepath,
-                    'metadata': metadata
-                })
-
-        return results
+        self._fold_access_times()
+        return [{'path': p, 'metadata': self._describe(p, self.file_index[p])} for p in paths]
 
     async def get_file_stats(self) -> Dict[str, Any]:
         """Get statistics about indexed files"""
@@ -267,49 +816,44 @@ class MCPFilesystemManager:
             return {}
 
         total_files = len(self.file_index)
-        total_size = sum(meta.get('size', 0) for meta in self.file_index.values())
-
-        # Group by extension
-        extensions = {}
-        for metadata in self.file_index.values():
-            ext = metadata.get('extension', 'no extension')
-            extensions[ext] = extensions.get(ext, 0) + 1
+        total_size = self._total_size
 
         return {
             'total_files': total_files,
             'total_size_bytes': total_size,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
-            'extensions': extensions,
+            'extensions': dict(self._ext_counts),
             'last_indexed': datetime.now().isoformat()
         }
 
     async def add_file_metadata(self, filepath: str, metadata: Dict[str, Any]):
         """Add custom metadata to a file"""
         if filepath in self.file_index:
-            if 'custom_metadata' not in self.file_index[filepath]:
-                self.file_index[filepath]['custom_metadata'] = {}
-            self.file_index[filepath]['custom_metadata'].update(metadata)
-            self._save_index()
+            self.metadata_cache.setdefault(filepath, {}).update(metadata)
+            self._mark_dirty()
             return True
         else:
             return False
 
     async def get_file_metadata(self, filepath: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a specific file"""
-        return self.file_index.get(filepath)
+        if filepath in self._atime_buf:
+            self._fold_access_times()
+        entry = self.file_index.get(filepath)
+        return self._describe(filepath, entry) if entry is not None else None
 
     async def export_index(self, export_path: str) -> bool:
         """Export index to JSON file"""
+        self._fold_access_times()
         try:
             export_data = {
                 'base_directory': str(self.base_directory),
                 'export_time': datetime.now().isoformat(),
                 'stats': await self.get_file_stats(),
-                'file_index': self.file_index
+                'file_index': {p: self._describe(p, e) for p, e in self.file_index.items()}
             }
 
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            _write_bytes(export_path, _dump_json(export_data))
 
             print(f"Index exported to {export_path}")
             return True
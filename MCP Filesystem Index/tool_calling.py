@@ -1,7 +1,16 @@
 import ollama
 import asyncio
+import atexit
+from typing import Optional
 import MCPFilesystemManager
 
+# Shared filesystem manager, opened lazily on the first tool call of each event loop
+_fm: Optional[MCPFilesystemManager.MCPFilesystemManager] = None
+_fm_loop: Optional[asyncio.AbstractEventLoop] = None
+_fm_lock: Optional[asyncio.Lock] = None
+# Task that opens, holds and closes _fm, so the MCP server is shut down inside its own loop
+_fm_task: Optional[asyncio.Task] = None
+
 tools = [
     {
         "type": "function",
@@ -156,41 +165,93 @@ tools = [
 ]
 
 
+async def _own_fm(opened: asyncio.Future):
+    global _fm
+    try:
+        async with MCPFilesystemManager.MCPFilesystemManager("../my_files") as fm:
+            _fm = fm
+            opened.set_result(fm)
+            # Park until close_fm() cancels us, or asyncio.run() cancels leftover tasks on exit
+            await asyncio.Event().wait()
+    except Exception as e:
+        if opened.done():
+            raise
+        opened.set_exception(e)
+    finally:
+        _fm = None
+
+
+async def get_fm() -> MCPFilesystemManager.MCPFilesystemManager:
+    global _fm_loop, _fm_lock, _fm_task
+    loop = asyncio.get_running_loop()
+    if _fm_loop is not loop:
+        # The MCP session and read drainer are bound to the loop that opened them.
+        # asyncio.run() closes them on exit; any other loop must call close_fm() first.
+        if _fm_task is not None and not _fm_task.done():
+            raise RuntimeError("The filesystem manager is still open on another event loop; "
+                               "await close_fm() before that loop ends")
+        _fm_loop = loop
+        _fm_lock = asyncio.Lock()
+        _fm_task = None
+
+    async with _fm_lock:
+        if _fm_task is None or _fm_task.done():
+            opened = loop.create_future()
+            _fm_task = asyncio.create_task(_own_fm(opened))
+            return await opened
+    return _fm
+
+
+async def close_fm():
+    if _fm_task is None or _fm_loop is not asyncio.get_running_loop():
+        return
+    _fm_task.cancel()
+    await asyncio.gather(_fm_task, return_exceptions=True)
+
+
+@atexit.register
+def _flush_fm_on_exit():
+    # The MCP session cannot be closed without its event loop, but pending index changes can still be saved
+    if _fm is not None:
+        _fm.flush_index()
+
+
 async def handle_function_call(function_name: str, arguments: dict) -> str:
-    async with MCPFilesystemManager.MCPFilesystemManager("../my_files") as fm:
-        if function_name == "read_file":
-            content = await fm.read_file(arguments["filepath"])
-            return content or "[Không đọc được nội dung file]"
+    fm = await get_fm()
 
-        elif function_name == "write_file":
-            success = await fm.write_file(arguments["filepath"], arguments["content"])
-            return "Ghi thành công" if success else "Ghi thất bại"
+    if function_name == "read_file":
+        content = await fm.read_file(arguments["filepath"])
+        return content or "[Không đọc được nội dung file]"
 
-        elif function_name == "refresh_filesystem_index":
-            await fm.refresh_index()
-            return "Đã làm mới chỉ mục hệ thống file thành công."
+    elif function_name == "write_file":
+        success = await fm.write_file(arguments["filepath"], arguments["content"])
+        return "Ghi thành công" if success else "Ghi thất bại"
 
-        elif function_name == "list_directory":
-            files = await fm.list_directory()
-            return f"Nội dung chứa trong thư mục: {files}"
+    elif function_name == "refresh_filesystem_index":
+        await fm.refresh_index()
+        return "Đã làm mới chỉ mục hệ thống file thành công."
 
-        elif function_name == "search_files":
-            files = await fm.search_files(arguments["query"], arguments["search_type"])
-            return f"Các file tìm thấy: {files}"
+    elif function_name == "list_directory":
+        files = await fm.list_directory()
+        return f"Nội dung chứa trong thư mục: {files}"
 
-        elif function_name == "get_file_metadata":
-            metadata = await fm.get_file_metadata(arguments["filepath"])
-            return f"Metadata của file: {metadata}"
+    elif function_name == "search_files":
+        files = await fm.search_files(arguments["query"], arguments["search_type"])
+        return f"Các file tìm thấy: {files}"
 
-        elif function_name == "add_file_metadata":
-            success = await fm.add_file_metadata(arguments["filepath"], arguments["metadata"])
-            return "Thêm metadata cho file thành công" if success else "Thêm metadata cho file thất bại"
+    elif function_name == "get_file_metadata":
+        metadata = await fm.get_file_metadata(arguments["filepath"])
+        return f"Metadata của file: {metadata}"
 
-        elif function_name == "export_index":
-            success = await fm.export_index(arguments["export_path"])
-            return "Xuất file chỉ mục (index) thành công" if success else "Xuất file chỉ mục (index) thất bại"
-        else:
-            return f"[Chưa hỗ trợ function: {function_name}]"
+    elif function_name == "add_file_metadata":
+        success = await fm.add_file_metadata(arguments["filepath"], arguments["metadata"])
+        return "Thêm metadata cho file thành công" if success else "Thêm metadata cho file thất bại"
+
+    elif function_name == "export_index":
+        success = await fm.export_index(arguments["export_path"])
+        return "Xuất file chỉ mục (index) thành công" if success else "Xuất file chỉ mục (index) thất bại"
+    else:
+        return f"[Chưa hỗ trợ function: {function_name}]"
 
 
 async def tool_calling(user_prompt):
@@ -215,22 +276,30 @@ async def tool_calling(user_prompt):
 
 
 
+async def main():
+    # All prompts share one event loop so they can reuse the same MCP session
+    try:
+        response = await tool_calling("Đọc file test.txt")
+        print(response)
+        response = await tool_calling("Viết file test.txt với nội dung: New technologies in Software development \n ChatAI \n Tool Calling")
+        print(response)
+        response = await tool_calling("Làm mới chỉ mục")
+        print(response)
+        response = await tool_calling("Lấy danh sách các file trong thư mục")
+        print(response)
+        response = await tool_calling("Tìm file example.txt")
+        print(response)
+        response = await tool_calling("Lấy metadata của example.txt")
+        print(response)
+        response = await tool_calling("Thêm metadata cho example.txt với metadata sau: {'category': 'test', 'tags': ['mcp', 'filesystem']}")
+        print(response)
+        response = await tool_calling("Xuất file chỉ mục ra ../my_files/index.json")
+        print(response)
+    finally:
+        await close_fm()
+
+
 if __name__ == "__main__":
-    response = asyncio.run(tool_calling("Đọc file test.txt"))
-    print(response)
-    response = asyncio.run(tool_calling("Viết file test.txt với nội dung: New technologies in Software development \n ChatAI \n Tool Calling"))
-    print(response)
-    response = asyncio.run(tool_calling("Làm mới chỉ mục"))
-    print(response)
-    response = asyncio.run(tool_calling("Lấy danh sách các file trong thư mục"))
-    print(response)
-    response = asyncio.run(tool_calling("Tìm file example.txt"))
-    print(response)
-    response = asyncio.run(tool_calling("Lấy metadata của example.txt"))
-    print(response)
-    response = asyncio.run(tool_calling("Thêm metadata cho example.txt với metadata sau: {'category': 'test', 'tags': ['mcp', 'filesystem']}"))
-    print(response)
-    response = asyncio.run(tool_calling("Xuất file chỉ mục ra ../my_files/index.json"))
-    print(response)
+    asyncio.run(main())
 
 
@@ -1,14 +1,31 @@
+import threading
+from typing import Optional
+
 import ollama
 
+MODEL = "llama3.2"
+
+# Shared client so every prompt reuses the same HTTP connection pool
+_client: Optional[ollama.Client] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> ollama.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ollama.Client()
+    return _client
+
+
 def ask_model(prompt: str) -> str:
-    client = ollama.Client()
-    model = "llama3.2"
-    response = client.generate(model=model, prompt=prompt)
+    response = _get_client().generate(model=MODEL, prompt=prompt)
     return response.response
 
-# #demo 
+# #demo
 # prompt = "What is the capital of France?"
 # result = ask_model(prompt)
-# print(f"Model: llama3.2")
+# print(f"Model: {MODEL}")
 # print("response:")
 # print(result)
\ No newline at end of file